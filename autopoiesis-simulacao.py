@@ -35,8 +35,10 @@ import pymunk
 import pymunk.pygame_util
 import random
 import math
+import numpy as np
+from numba import njit
 from enum import Enum
-from typing import List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 COLORS = {
     'background': (10, 10, 30),
@@ -48,14 +50,98 @@ COLORS = {
     'debug': (255, 0, 0)           # Vermelho
 }
 
+@njit(cache=True, fastmath=True)
+def compute_confinement_forces(pos, out_forces, cx, cy, radius, attraction):
+    # Soma a força de confinamento às partículas fora do raio
+    radius_sq = radius * radius
+    for i in range(pos.shape[0]):
+        dx = pos[i, 0] - cx
+        dy = pos[i, 1] - cy
+        d2 = dx * dx + dy * dy
+        if d2 > radius_sq:
+            d = math.sqrt(d2)
+            k = (d - radius) * attraction / d
+            out_forces[i, 0] -= dx * k
+            out_forces[i, 1] -= dy * k
+
+@njit(cache=True, fastmath=True)
+def compute_boundary_corrections(pos, radii, cx, cy, boundary_radius):
+    # Retorna os índices das partículas que tocam a borda e suas posições corrigidas
+    n = pos.shape[0]
+    hits = np.empty(n, dtype=np.int64)
+    corrected = np.empty((n, 2), dtype=np.float64)
+    count = 0
+    for i in range(n):
+        dx = pos[i, 0] - cx
+        dy = pos[i, 1] - cy
+        limit = boundary_radius - radii[i]
+        d2 = dx * dx + dy * dy
+        if d2 >= limit * limit:
+            inv = limit / math.sqrt(d2)
+            hits[count] = i
+            corrected[count, 0] = cx + dx * inv
+            corrected[count, 1] = cy + dy * inv
+            count += 1
+    return hits[:count], corrected[:count]
+
+@njit(cache=True)
+def pick_partner(pos, ptype, idx, partner_type, cutoff_sq, rand_u):
+    # Escolhe uniformemente (via rand_u em [0, 1)) uma partícula do tipo pedido
+    # a menos de sqrt(cutoff_sq) de idx; retorna -1 se não houver nenhuma
+    x = pos[idx, 0]
+    y = pos[idx, 1]
+    count = 0
+    for j in range(pos.shape[0]):
+        if j == idx or ptype[j] != partner_type:
+            continue
+        dx = pos[j, 0] - x
+        dy = pos[j, 1] - y
+        if dx * dx + dy * dy < cutoff_sq:
+            count += 1
+    if count == 0:
+        return -1
+    target = int(rand_u * count)
+    for j in range(pos.shape[0]):
+        if j == idx or ptype[j] != partner_type:
+            continue
+        dx = pos[j, 0] - x
+        dy = pos[j, 1] - y
+        if dx * dx + dy * dy < cutoff_sq:
+            if target == 0:
+                return j
+            target -= 1
+    return -1
+
 class ParticleType(Enum):
     SUBSTRATE = 1
     CATALYST = 2
     LINK = 3
 
+# Categorias de colisão (bits) usadas pelos filtros de shape no broadphase
+CAT_SUBSTRATE = 1 << 0
+CAT_CATALYST = 1 << 1
+CAT_LINK = 1 << 2
+CAT_SENSOR = 1 << 3
+
+SHAPE_FILTERS = {
+    ParticleType.SUBSTRATE: pymunk.ShapeFilter(categories=CAT_SUBSTRATE,
+                                               mask=CAT_SUBSTRATE | CAT_CATALYST | CAT_LINK),
+    ParticleType.CATALYST: pymunk.ShapeFilter(categories=CAT_CATALYST,
+                                              mask=CAT_SUBSTRATE | CAT_CATALYST | CAT_LINK),
+    ParticleType.LINK: pymunk.ShapeFilter(categories=CAT_LINK,
+                                          mask=CAT_SUBSTRATE | CAT_CATALYST | CAT_LINK | CAT_SENSOR),
+}
+# O sensor de link só enxerga outros links
+SENSOR_FILTER = pymunk.ShapeFilter(categories=CAT_SENSOR, mask=CAT_LINK)
+
 class Particle:
     def __init__(self, x: float, y: float, space: pymunk.Space, particle_type: ParticleType):
         self.type = particle_type
+        # Marcadores pré-calculados para evitar comparações de Enum em laços críticos
+        self.type_value: int = particle_type.value
+        self.is_substrate = particle_type is ParticleType.SUBSTRATE
+        self.is_catalyst = particle_type is ParticleType.CATALYST
+        self.is_link = particle_type is ParticleType.LINK
         self.radius = 8 if particle_type != ParticleType.CATALYST else 12
         mass = 1
         
@@ -64,6 +150,8 @@ class Particle:
             moment = pymunk.moment_for_poly(mass, vertices)
             self.body = pymunk.Body(mass, moment)
             self.shape = pymunk.Poly(self.body, vertices)
+            # Vértices locais em cache para o desenho (evita recriar Vec2d a cada frame)
+            self.local_vertices = tuple((v.x, v.y) for v in self.shape.get_vertices())
         else:
             moment = pymunk.moment_for_circle(mass, 0, self.radius)
             self.body = pymunk.Body(mass, moment)
@@ -75,6 +163,7 @@ class Particle:
         self.shape.elasticity = 0.8
         self.shape.friction = 0.7
         self.shape.collision_type = particle_type.value
+        self.shape.filter = SHAPE_FILTERS[particle_type]
         
         # Adicionar sensor para links
         if particle_type == ParticleType.LINK:
@@ -82,17 +171,24 @@ class Particle:
             self.sensor = pymunk.Circle(self.body, sensor_radius)
             self.sensor.sensor = True
             self.sensor.collision_type = 10  # Tipo especial para sensor
+            self.sensor.filter = SENSOR_FILTER
             space.add(self.sensor)
             
         space.add(self.body, self.shape)
         
-        self.connections: List[Particle] = []
+        self.connections: Set[Particle] = set()
         self.max_connections = 2 if particle_type == ParticleType.LINK else 0
         self.age = 0  # Idade da partícula para controle de desintegração
+        # Posições em self.particles / self.links da simulação (remoção em O(1))
+        self.index = -1
+        self.link_index = -1
 
 class AutopoiesisSimulation:
     def __init__(self):
         pygame.init()
+        # Enfileirar apenas os eventos tratados no laço principal
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN])
         self.width = 800
         self.height = 800
         self.screen = pygame.display.set_mode((self.width, self.height))
@@ -100,20 +196,64 @@ class AutopoiesisSimulation:
         
         # Configuração da fonte para estatísticas
         self.font = pygame.font.Font(None, 24)
+        # Cache de superfícies de texto já renderizadas
+        self._text_cache: Dict[str, pygame.Surface] = {}
+        self._text_cache_size = 64
+        # Painel de estatísticas composto, refeito só quando os valores mudam
+        self._last_stats: Tuple[int, ...] = ()
+        self._stats_surf: Optional[pygame.Surface] = None
+        
+        # Circunferência de contenção pré-renderizada (desenhada uma única vez).
+        # Superfície do tamanho do anel com colorkey RLE: bem mais barata de copiar
+        # que uma tela inteira com alpha por pixel.
+        boundary_radius = 200
+        size = 2 * boundary_radius + 4
+        self._boundary_surf = pygame.Surface((size, size)).convert()
+        self._boundary_surf.fill((0, 0, 0))
+        pygame.draw.circle(self._boundary_surf, COLORS['debug'], (size // 2, size // 2), boundary_radius, 2)
+        self._boundary_surf.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        self._boundary_pos = (self.width // 2 - size // 2, self.height // 2 - size // 2)
         
         # Configuração do espaço físico
         self.space = pymunk.Space()
         self.space.gravity = (0, 0)
         self.space.damping = 0.8  # Amortecimento global
+        self.dt = 1/60.0  # Passo de integração
+        # Broadphase por hash espacial: muitas partículas pequenas do mesmo tamanho
+        # (dim ~ diâmetro do substrato, count ~ número esperado de shapes)
+        self.space.use_spatial_hash(16, 1000)
         self.draw_options = pymunk.pygame_util.DrawOptions(self.screen)
         
         # Lista de partículas e ligações
         self.particles: List[Particle] = []
+        self.links: List[Particle] = []  # Subconjunto de self.particles com os links
         self.bonds: List[pymunk.Constraint] = []
         
+        # Espelho contíguo (SoA) das posições, raios e tipos, alinhado com self.particles
+        self._pos_buf = np.empty((512, 2), dtype=np.float64)
+        self._radius_buf = np.empty(512, dtype=np.float64)
+        self._type_buf = np.empty(512, dtype=np.int64)
+        
+        # Gerador de números aleatórios e buffer pré-amostrado de ruído browniano
+        self._rng = np.random.default_rng()
+        self._noise_frames = 120  # Frames cobertos por cada reabastecimento
+        self._noise_buf = np.empty(0, dtype=np.float64)
+        self._noise_idx = 0
+        self._brownian_forces: Optional[np.ndarray] = None
+        
+        # Índices para localizar partículas a partir de shapes/sensores em O(1)
+        self.shape_to_particle: Dict[pymunk.Shape, Particle] = {}
+        self.sensor_to_particle: Dict[pymunk.Shape, Particle] = {}
+        
+        # Distância máxima entre os dois substratos de uma reação
+        self.reaction_radius = 40
+        
         # Lista temporária para remoção de partículas e ligações
         self.to_remove: List[Tuple[Particle, pymunk.Constraint]] = []
         
+        # Contadores por tipo de partícula, mantidos na criação/remoção
+        self.counts: Dict[int, int] = {t.value: 0 for t in ParticleType}
+        
         # Estatísticas
         self.stats = {
             'substrate': 0,
@@ -148,7 +288,7 @@ class AutopoiesisSimulation:
             self.space, 
             ParticleType.CATALYST
         )
-        self.particles.append(catalyst)
+        self._add_particle(catalyst)
         
         # Adicionar substrato dentro de um círculo
         num_substrate = 300
@@ -159,11 +299,54 @@ class AutopoiesisSimulation:
             x = self.width / 2 + r * math.cos(angle)
             y = self.height / 2 + r * math.sin(angle)
             substrate = Particle(x, y, self.space, ParticleType.SUBSTRATE)
-            self.particles.append(substrate)
+            self._add_particle(substrate)
+    
+    def _add_particle(self, particle: Particle):
+        i = len(self.particles)
+        if i == self._pos_buf.shape[0]:
+            self._grow_buffers()
+        pos = particle.body.position
+        self._pos_buf[i, 0] = pos.x
+        self._pos_buf[i, 1] = pos.y
+        self._radius_buf[i] = particle.radius
+        self._type_buf[i] = particle.type_value
+        particle.index = i
+        self.particles.append(particle)
+        if particle.is_link:
+            particle.link_index = len(self.links)
+            self.links.append(particle)
+        self.counts[particle.type_value] += 1
+        self.shape_to_particle[particle.shape] = particle
+        if hasattr(particle, 'sensor'):
+            self.sensor_to_particle[particle.sensor] = particle
+    
+    def _grow_buffers(self):
+        capacity = self._pos_buf.shape[0] * 2
+        n = len(self.particles)
+        pos_buf = np.empty((capacity, 2), dtype=np.float64)
+        pos_buf[:n] = self._pos_buf[:n]
+        radius_buf = np.empty(capacity, dtype=np.float64)
+        radius_buf[:n] = self._radius_buf[:n]
+        type_buf = np.empty(capacity, dtype=np.int64)
+        type_buf[:n] = self._type_buf[:n]
+        self._pos_buf = pos_buf
+        self._radius_buf = radius_buf
+        self._type_buf = type_buf
+    
+    def sync_positions(self):
+        # Copiar as posições do pymunk para o espelho uma única vez por frame
+        buf = self._pos_buf
+        for i, particle in enumerate(self.particles):
+            x, y = particle.body.position
+            buf[i, 0] = x
+            buf[i, 1] = y
+    
+    def positions(self) -> np.ndarray:
+        return self._pos_buf[:len(self.particles)]
     
     def create_link(self, pos: Tuple[float, float]):
         link = Particle(pos[0], pos[1], self.space, ParticleType.LINK)
-        self.particles.append(link)
+        self._add_particle(link)
         return link
     
     def create_bond(self, p1: Particle, p2: Particle):
@@ -177,21 +360,25 @@ class AutopoiesisSimulation:
         )
         self.space.add(joint)
         self.bonds.append(joint)
-        p1.connections.append(p2)
-        p2.connections.append(p1)
+        p1.connections.add(p2)
+        p2.connections.add(p1)
     
     def handle_catalyst_substrate(self, arbiter, space, data):
         if random.random() < 0.15:  # Aumentada probabilidade de reação
             substrate_shape = arbiter.shapes[1]
-            nearby_substrates = [
-                p for p in self.particles 
-                if (p.type == ParticleType.SUBSTRATE and 
-                    p.shape != substrate_shape and
-                    self.distance(substrate_shape.body.position, p.body.position) < 40)
-            ]
+            substrate = self.shape_to_particle.get(substrate_shape)
+            if substrate is None:
+                return True
+            # Chamado dentro de space.step: o buffer ainda tem as posições do último
+            # sync_positions, então o atualizamos para comparar posições atuais
+            self.sync_positions()
+            n = len(self.particles)
+            j = pick_partner(self.positions(), self._type_buf[:n], substrate.index,
+                             ParticleType.SUBSTRATE.value, self.reaction_radius ** 2,
+                             self._rng.random())
             
-            if nearby_substrates:
-                second_substrate = random.choice(nearby_substrates)
+            if j >= 0:
+                second_substrate = self.particles[j]
                 # Criar link na posição média
                 pos = ((substrate_shape.body.position.x + second_substrate.body.position.x) / 2,
                       (substrate_shape.body.position.y + second_substrate.body.position.y) / 2)
@@ -206,13 +393,10 @@ class AutopoiesisSimulation:
         link_sensor = arbiter.shapes[0]
         link_shape = arbiter.shapes[1]
 
-        p1_candidates = [p for p in self.particles if hasattr(p, 'sensor') and p.sensor == link_sensor]
-        p2_candidates = [p for p in self.particles if p.shape == link_shape]
-
-        if p1_candidates and p2_candidates:
-            p1 = p1_candidates[0]  # Seleciona o primeiro candidato
-            p2 = p2_candidates[0]  # Seleciona o primeiro candidato
+        p1 = self.sensor_to_particle.get(link_sensor)
+        p2 = self.shape_to_particle.get(link_shape)
 
+        if p1 is not None and p2 is not None:
             if (p1 != p2 and
                 len(p1.connections) < p1.max_connections and
                 len(p2.connections) < p2.max_connections and
@@ -223,97 +407,202 @@ class AutopoiesisSimulation:
 
     
     def remove_particle(self, shape):
-        try:
-            particle = next(p for p in self.particles if p.shape == shape)
-            if hasattr(particle, 'sensor'):
-                self.space.remove(particle.sensor)
-            self.space.remove(particle.shape, particle.body)
-            self.particles.remove(particle)
-        except StopIteration:
-            print("Warning: Attempted to remove a particle that was not found.")
+        particle = self.shape_to_particle.pop(shape, None)
+        if particle is None:
+            return  # Já removida (ex.: marcada duas vezes no mesmo frame)
+        if hasattr(particle, 'sensor'):
+            self.space.remove(particle.sensor)
+            del self.sensor_to_particle[particle.sensor]
+        self.space.remove(particle.shape, particle.body)
+        # Trocar com a última partícula e remover do fim, mantendo os buffers alinhados
+        i = particle.index
+        last = len(self.particles) - 1
+        if i != last:
+            moved = self.particles[last]
+            self.particles[i] = moved
+            moved.index = i
+            self._pos_buf[i] = self._pos_buf[last]
+            self._radius_buf[i] = self._radius_buf[last]
+            self._type_buf[i] = self._type_buf[last]
+        self.particles.pop()
+        if particle.is_link:
+            j = particle.link_index
+            moved = self.links.pop()
+            if moved is not particle:
+                self.links[j] = moved
+                moved.link_index = j
+        self.counts[particle.type_value] -= 1
     
     def apply_brownian_motion(self):
-        center = pymunk.Vec2d(self.width / 2, self.height / 2)
         confinement_radius = 200  # Raio de confinamento
         attraction_strength = 0.5  # Força de atração
 
-        for particle in self.particles:
-            if particle.type != ParticleType.CATALYST:
-                # Força de movimento browniano
-                force_x = random.gauss(0, 300)
-                force_y = random.gauss(0, 300)
-                particle.body.apply_force_at_local_point((force_x, force_y), (0, 0))
-
-                # Força de confinamento
-                distance_to_center = center.get_distance(particle.body.position)
-                if distance_to_center > confinement_radius:
-                    direction_to_center = (center - particle.body.position).normalized()
-                    confinement_force = direction_to_center * (distance_to_center - confinement_radius) * attraction_strength
-                    particle.body.apply_force_at_local_point(confinement_force)
+        if not self.particles:
+            self._brownian_forces = None
+            return
+
+        pos = self.positions()
+        is_catalyst = self._type_buf[:len(self.particles)] == ParticleType.CATALYST.value
+
+        # Força de movimento browniano (pré-amostrada em lote)
+        forces = self._brownian_noise(pos.shape[0])
+
+        # Força de confinamento
+        compute_confinement_forces(pos, forces, self.width / 2, self.height / 2,
+                                   confinement_radius, attraction_strength)
+
+        # Catalisadores não sofrem movimento browniano
+        forces[is_catalyst] = 0.0
+
+        # Aplicadas só depois de handle_boundary_collision (apply_brownian_impulses),
+        # como a força acumulada que só era integrada no próximo space.step
+        self._brownian_forces = forces
+    
+    def apply_brownian_impulses(self):
+        forces = self._brownian_forces
+        if forces is None:
+            return
+        self._brownian_forces = None
+
+        # Integrar as forças diretamente na velocidade com um impulso J = F * dt
+        # (dv = F/m * dt), sem passar pelo acumulador de forças do pymunk.
+        # Partículas criadas neste frame (sem linha em forces) ficam de fora.
+        dt = self.dt
+        for particle, (force_x, force_y) in zip(self.particles, forces.tolist()):
+            if force_x or force_y:
+                particle.body.apply_impulse_at_local_point((force_x * dt, force_y * dt))
+    
+    def _brownian_noise(self, n: int) -> np.ndarray:
+        size = 2 * n
+        if self._noise_idx + size > self._noise_buf.shape[0]:
+            self._noise_buf = self._rng.standard_normal(size * self._noise_frames) * 300.0
+            self._noise_idx = 0
+        start = self._noise_idx
+        self._noise_idx += size
+        return self._noise_buf[start:start + size].reshape(n, 2)
     
     def handle_disintegration(self):
-        for particle in list(self.particles):
-            if particle.type == ParticleType.LINK:
-                particle.age += 1
-                if particle.age > 2*500 and random.random() < 0.01:
-                    # Remover ligações
-                    for connected in particle.connections:
-                        connected.connections.remove(particle)
-                    # Criar dois substratos
-                    pos = particle.body.position
-                    offset = 10
-                    Particle(pos.x + offset, pos.y, self.space, ParticleType.SUBSTRATE)
-                    Particle(pos.x - offset, pos.y, self.space, ParticleType.SUBSTRATE)
-                    self.to_remove.append((particle.shape, None))
+        links = self.links
+        if not links:
+            return
+
+        for particle in links:
+            particle.age += 1
+
+        # Sorteio em lote de quais links antigos se desintegram
+        ages = np.fromiter((p.age for p in links), dtype=np.int64, count=len(links))
+        probs = self._rng.random(len(links))
+        mask = (ages > 2*500) & (probs < 0.01)
+
+        for i in np.flatnonzero(mask).tolist():
+            particle = links[i]
+            # Remover ligações
+            for connected in particle.connections:
+                connected.connections.discard(particle)
+            # Criar dois substratos
+            pos = particle.body.position
+            offset = 10
+            self._add_particle(Particle(pos.x + offset, pos.y, self.space, ParticleType.SUBSTRATE))
+            self._add_particle(Particle(pos.x - offset, pos.y, self.space, ParticleType.SUBSTRATE))
+            self.to_remove.append((particle.shape, None))
 
     def handle_boundary_collision(self):
-        center = pymunk.Vec2d(self.width / 2, self.height / 2)
         boundary_radius = 200  # Raio da circunferência
 
-        for particle in self.particles:
-            #if particle.type != ParticleType.CATALYST:
-                distance_to_center = center.get_distance(particle.body.position)
-                if distance_to_center >= boundary_radius - particle.radius:
-                    # Calcular a normal e ricochetear
-                    normal = (particle.body.position - center).normalized()
-                    particle.body.position = center + normal * (boundary_radius - particle.radius)
-                    particle.body.velocity = -particle.body.velocity  # Inverter a velocidade para simular ricocheteamento
+        if not self.particles:
+            return
+
+        pos = self.positions()
+        radii = self._radius_buf[:len(self.particles)]
+
+        hits, corrected = compute_boundary_corrections(pos, radii, self.width / 2, self.height / 2,
+                                                       boundary_radius)
+        particles = self.particles
+        for i, (x, y) in zip(hits.tolist(), corrected.tolist()):
+            # Reposicionar sobre a borda e ricochetear
+            body = particles[i].body
+            body.position = (x, y)
+            pos[i, 0] = x
+            pos[i, 1] = y
+            vx, vy = body.velocity
+            body.velocity = (-vx, -vy)  # Inverter a velocidade para simular ricocheteamento
 
     def update_stats(self):
-        self.stats['substrate'] = len([p for p in self.particles if p.type == ParticleType.SUBSTRATE])
-        self.stats['links'] = len([p for p in self.particles if p.type == ParticleType.LINK])
+        self.stats['substrate'] = self.counts[ParticleType.SUBSTRATE.value]
+        self.stats['links'] = self.counts[ParticleType.LINK.value]
         self.stats['bonds'] = len(self.bonds)
     
     def draw_stats(self):
-        y = 10
+        current = tuple(self.stats.values())
+        if current != self._last_stats:
+            self._stats_surf = self._render_stats()
+            self._last_stats = current
+        self.screen.blit(self._stats_surf, (10, 10))
+    
+    def _render_stats(self) -> pygame.Surface:
+        lines = []
         for key, value in self.stats.items():
-            text = self.font.render(f"{key}: {value}", True, COLORS['text'])
-            self.screen.blit(text, (10, y))
-            y += 25
+            label = f"{key}: {value}"
+            text = self._text_cache.get(label)
+            if text is None:
+                if len(self._text_cache) >= self._text_cache_size:
+                    # Descartar a entrada mais antiga
+                    del self._text_cache[next(iter(self._text_cache))]
+                text = self.font.render(label, True, COLORS['text'])
+                self._text_cache[label] = text
+            lines.append(text)
+        
+        line_height = 25
+        width = max(text.get_width() for text in lines)
+        height = line_height * (len(lines) - 1) + lines[-1].get_height()
+        surf = pygame.Surface((width, height), pygame.SRCALPHA)
+        y = 0
+        for text in lines:
+            surf.blit(text, (0, y))
+            y += line_height
+        return surf
     
     def draw_particles(self):
-        for particle in self.particles:
-            pos = particle.body.position
-            if particle.type == ParticleType.SUBSTRATE:
-                pygame.draw.circle(self.screen, COLORS['substrate'], 
-                                (int(pos.x), int(pos.y)), particle.radius)
-            elif particle.type == ParticleType.CATALYST:
-                vertices = []
-                for v in particle.shape.get_vertices():
-                    x = v.rotated(particle.body.angle).x + pos.x
-                    y = v.rotated(particle.body.angle).y + pos.y
-                    vertices.append((int(x), int(y)))
-                pygame.draw.polygon(self.screen, COLORS['catalyst'], vertices)
-            elif particle.type == ParticleType.LINK:
-                #pygame.draw.circle(self.screen, COLORS['link'], 
-                #                (int(pos.x), int(pos.y)), particle.radius)
-                rect = pygame.Rect(
-                                int(pos.x - particle.radius),
-                                int(pos.y - particle.radius),
-                                particle.radius * 2,
-                                particle.radius * 2
-                )
-                pygame.draw.rect(self.screen, COLORS['link'], rect)
+        screen = self.screen
+        draw_circle = pygame.draw.circle
+        draw_rect = pygame.draw.rect
+        draw_polygon = pygame.draw.polygon
+
+        # Separar partículas por tipo em uma única passada
+        substrates = []
+        catalysts = []
+        links = []
+        for particle, pos in zip(self.particles, self.positions().tolist()):
+            if particle.is_substrate:
+                substrates.append((particle, pos))
+            elif particle.is_catalyst:
+                catalysts.append((particle, pos))
+            elif particle.is_link:
+                links.append((particle, pos))
+
+        # Ordem de desenho: catalisadores por baixo, depois substratos e links por cima
+        color = COLORS['catalyst']
+        for particle, (px, py) in catalysts:
+            angle = particle.body.angle
+            c = math.cos(angle)
+            s = math.sin(angle)
+            vertices = [
+                (int(vx * c - vy * s + px), int(vx * s + vy * c + py))
+                for vx, vy in particle.local_vertices
+            ]
+            draw_polygon(screen, color, vertices)
+
+        color = COLORS['substrate']
+        for particle, (px, py) in substrates:
+            draw_circle(screen, color, (int(px), int(py)), particle.radius)
+
+        color = COLORS['link']
+        rects = []
+        for particle, (px, py) in links:
+            size = particle.radius * 2
+            rects.append(pygame.Rect(int(px - particle.radius), int(py - particle.radius), size, size))
+        for rect in rects:
+            draw_rect(screen, color, rect)
     
     def draw_bonds(self):
         for bond in self.bonds:
@@ -329,10 +618,7 @@ class AutopoiesisSimulation:
     
     def draw_boundary(self):
         # Desenhar a circunferência
-        pygame.draw.circle(self.screen, COLORS['debug'], (self.width // 2, self.height // 2), 200, 2)
-    
-    def distance(self, pos1, pos2):
-        return math.sqrt((pos1.x - pos2.x)**2 + (pos1.y - pos2.y)**2)
+        self.screen.blit(self._boundary_surf, self._boundary_pos)
     
     def run(self):
         clock = pygame.time.Clock()
@@ -349,7 +635,8 @@ class AutopoiesisSimulation:
             self.screen.fill(COLORS['background'])
             
             # Atualizar física
-            self.space.step(1/60.0)
+            self.space.step(self.dt)
+            self.sync_positions()
             
             # Aplicar movimento browniano
             self.apply_brownian_motion()
@@ -360,6 +647,9 @@ class AutopoiesisSimulation:
             # Gerenciar colisão com a circunferência
             self.handle_boundary_collision()
             
+            # Aplicar as forças brownianas e de confinamento calculadas acima
+            self.apply_brownian_impulses()
+            
             # Remover partículas e ligações marcadas
             for shape, bond in self.to_remove:
                 if shape: